@@ -1,8 +1,19 @@
 """Slack Canvas Creator from Threads - A Slack app for creating Canvas from thread discussions."""
 
-__version__ = "0.1.0"
+from typing import Any
 
-from .app import CanvasCreatorApp
-from .main import app
+__version__ = "0.1.0"
 
 __all__ = ["CanvasCreatorApp", "app"]
+
+
+def __getattr__(name: str) -> Any:
+    # Importing main builds the Bolt app, which loads and validates the settings,
+    # so it is deferred until one of the exports is used. Importing a submodule
+    # such as config on its own therefore does not touch the environment.
+    if name in __all__:
+        from . import main
+
+        globals().update(CanvasCreatorApp=main.CanvasCreatorApp, app=main.app)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
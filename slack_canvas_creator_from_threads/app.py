@@ -1,10 +1,15 @@
 """Main application logic for the Slack Canvas Creator."""
 
+import asyncio
+import contextlib
 import logging
 from typing import Optional, List, Dict, Any
 
-from .slack_service import SlackService
-from .openai_service import OpenAIService
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from .slack_service import SlackService, get_slack_service
+from .openai_service import OpenAIService, get_openai_service
 
 
 logger = logging.getLogger(__name__)
@@ -14,8 +19,21 @@ class CanvasCreatorApp:
     """Main application class for creating canvases from thread content."""
 
     def __init__(self) -> None:
-        self.slack_service: SlackService = SlackService()
-        self.openai_service: OpenAIService = OpenAIService()
+        self.slack_service: SlackService = get_slack_service()
+        self.openai_service: OpenAIService = get_openai_service()
+
+    async def bootstrap(self, *slack_clients: AsyncWebClient) -> None:
+        """
+        Warm up state that is fixed for the bot's lifetime, such as the workspace URL.
+
+        Args:
+            slack_clients: Other Slack clients to share the Slack connection pool with
+        """
+        await self.slack_service.bootstrap(*slack_clients)
+
+    async def aclose(self) -> None:
+        """Release the HTTP connections held by the underlying services."""
+        await asyncio.gather(self.slack_service.aclose(), self.openai_service.aclose())
 
     async def create_canvas_from_thread(
         self,
@@ -37,62 +55,64 @@ class CanvasCreatorApp:
             Canvas ID
         """
         try:
-            # Step 1: Get thread messages
-            logger.info(f"Getting thread messages for {thread_ts}")
-            messages: List[Dict[str, Any]] = await self.slack_service.get_thread_messages(channel, thread_ts)
+            # Step 1 & 2: Get thread messages and generate thread link concurrently
+            logger.info("Getting thread messages and link for %s", thread_ts)
+            messages: List[Dict[str, Any]]
+            thread_link: str
+            messages, thread_link = await asyncio.gather(
+                self.slack_service.get_thread_messages(channel, thread_ts),
+                self.slack_service.get_thread_link(channel, thread_ts)
+            )
 
             if not messages:
                 raise ValueError("No messages found in the thread")
 
-            # Step 2: Generate thread link
-            logger.info("Generating thread link")
-            thread_link: str = await self.slack_service.get_thread_link(channel, thread_ts)
-
             # Step 3: Summarize content using OpenAI
             logger.info("Summarizing thread content with OpenAI")
-            ai_title, summary = await self.openai_service.summarize_thread_content(messages, thread_link)
+            ai_title, summary = await self.openai_service.summarize_thread_content(
+                messages, thread_link, cache_key=f"{channel}:{thread_ts}"
+            )
 
             # Step 4: Create canvas
             title: str = canvas_title or ai_title
-            logger.info(f"Creating canvas with title: {title}")
+            logger.info("Creating canvas with title: %s", title)
 
             try:
                 canvas_id: str = await self.slack_service.create_canvas(title, summary)
-
-                # Step 5: Try to share canvas with user (optional)
-                try:
-                    logger.info(f"Sharing canvas with user {user_id}")
-                    await self.slack_service.share_canvas_with_user(canvas_id, user_id)
-                except Exception as share_error:
-                    logger.warning(f"Canvas sharing failed, but canvas was created: {share_error}")
-
-                # Step 6: Send canvas link to user
-                logger.info("Sending canvas link to user")
-                await self.slack_service.send_canvas_link(channel, user_id, canvas_id, thread_ts)
-
-                logger.info(f"Successfully created and shared canvas {canvas_id}")
-                return canvas_id
-
-            except Exception as canvas_error:
-                logger.warning(f"Canvas creation failed, falling back to file upload: {canvas_error}")
+            except SlackApiError as canvas_error:
+                logger.warning("Canvas creation failed, falling back to file upload: %s", canvas_error)
 
                 # Fallback: Create as markdown file
                 file_id: str = await self.slack_service.create_canvas_fallback(
                     title, summary, channel, user_id
                 )
 
-                logger.info(f"Successfully created markdown file {file_id} as fallback")
+                logger.info("Successfully created markdown file %s as fallback", file_id)
                 return file_id
 
+            # Step 5 & 6: Share canvas with user (optional) and send canvas link concurrently
+            logger.info("Sharing canvas with user %s and sending canvas link", user_id)
+            share_result, link_result = await asyncio.gather(
+                self.slack_service.share_canvas_with_user(canvas_id, user_id),
+                self.slack_service.send_canvas_link(channel, user_id, canvas_id, thread_ts),
+                return_exceptions=True
+            )
+
+            if isinstance(share_result, BaseException):
+                logger.warning("Canvas sharing failed, but canvas was created: %s", share_result)
+            if isinstance(link_result, BaseException):
+                raise link_result
+
+            logger.info("Successfully created and shared canvas %s", canvas_id)
+            return canvas_id
+
         except Exception as e:
-            logger.error(f"Error creating canvas from thread: {e}")
-            # Send error message to user
-            try:
+            logger.error("Error creating canvas from thread: %s", e)
+            # Send error message to user, without failing if it cannot be sent
+            with contextlib.suppress(Exception):
                 await self.slack_service.client.chat_postMessage(
                     channel=channel,
                     text=f"<@{user_id}> Canvasの作成中にエラーが発生しました: {str(e)}",
                     thread_ts=thread_ts
                 )
-            except Exception:
-                pass  # Don't fail if we can't send error message
             raise
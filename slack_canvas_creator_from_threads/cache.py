@@ -0,0 +1,82 @@
+"""Small in-memory caches for short-lived state shared between Slack requests."""
+
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded mapping whose entries expire a fixed number of seconds after being set."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        # Entries are kept in expiry order because every set() re-appends with the same ttl
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """
+        Get a value if it is present and not expired.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            Cached value or default
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """
+        Store a value, evicting expired entries and the oldest ones beyond maxsize.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._evict_expired()
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """
+        Remove a value and return it if it was not expired.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            Removed value or default
+        """
+        item = self._data.pop(key, None)
+        if item is None or item[0] <= time.monotonic():
+            return default
+        return item[1]
+
+    def _evict_expired(self) -> None:
+        """Drop expired entries from the front of the expiry-ordered mapping."""
+        now = time.monotonic()
+        while self._data:
+            expires_at, _ = next(iter(self._data.values()))
+            if expires_at > now:
+                break
+            self._data.popitem(last=False)
@@ -1,26 +1,61 @@
 """Configuration settings for the Slack Canvas Creator app."""
 
-try:
-    from pydantic_settings import BaseSettings
-except ImportError:
-    from pydantic import BaseSettings
+from dataclasses import dataclass
+from functools import lru_cache
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+
     # Slack settings (Socket Mode)
     slack_bot_token: str
     slack_signing_secret: str
     slack_app_token: str  # Required for Socket Mode
+    slack_socket_mode_connections: int = Field(1, ge=1, le=10)  # Concurrent connections (Slack allows up to 10)
 
     # OpenAI settings
     openai_api_key: str
-    openai_model: str = "gpt-4o-mini"
-
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-
+    openai_model: str = "gpt-4o"  # Used for threads at or above the input token threshold
+    openai_small_model: str = "gpt-4o-mini"  # Used for threads below the input token threshold
+    openai_small_model_max_input_tokens: int = 8000
+    openai_max_requests_per_minute: int = 500
+    openai_max_tokens_per_minute: int = 200000
+    openai_max_retries: int = 5
+    openai_min_messages: int = 2  # Shorter threads are listed as-is without OpenAI
+    openai_min_thread_chars: int = 200
+    openai_concurrency: int = 10  # Concurrent requests when summarizing several threads
+    openai_batch_threshold: int = 20  # Use the Batch API from this many threads
+    openai_batch_poll_interval: float = 30.0  # Seconds between batch status checks
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeSettings:
+    """Immutable snapshot of the validated settings used at runtime."""
 
-settings = Settings()
+    slack_bot_token: str
+    slack_signing_secret: str
+    slack_app_token: str
+    slack_socket_mode_connections: int
+    openai_api_key: str
+    openai_model: str
+    openai_small_model: str
+    openai_small_model_max_input_tokens: int
+    openai_max_requests_per_minute: int
+    openai_max_tokens_per_minute: int
+    openai_max_retries: int
+    openai_min_messages: int
+    openai_min_thread_chars: int
+    openai_concurrency: int
+    openai_batch_threshold: int
+    openai_batch_poll_interval: float
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> RuntimeSettings:
+    """Load and validate the settings on first use and return a frozen snapshot."""
+    return RuntimeSettings(**Settings().model_dump())
@@ -2,7 +2,10 @@
 
 import logging
 import asyncio
-from typing import Any, Dict
+import json
+import re
+import secrets
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from slack_bolt.async_app import AsyncApp
 from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
@@ -10,28 +13,140 @@ from slack_bolt.context.ack import Ack
 from slack_bolt.context.say import Say
 from slack_sdk.web.async_client import AsyncWebClient
 
-from .config import settings
+from .config import get_settings
 from .app import CanvasCreatorApp
+from .cache import TTLCache
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional and not available on Windows
+    uvloop = None
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The Bolt app below needs the tokens at import time
+settings = get_settings()
+
 # Initialize Slack app for Socket Mode
+# Socket Mode payloads arrive over an authenticated WebSocket and are not
+# HMAC-signed, so the request verification middleware is disabled.
 app = AsyncApp(
     token=settings.slack_bot_token,
-    signing_secret=settings.slack_signing_secret
+    signing_secret=settings.slack_signing_secret,
+    request_verification_enabled=False
 )
 
 # Initialize canvas creator app
 canvas_creator: CanvasCreatorApp = CanvasCreatorApp()
 
+# Confirmation requests waiting for a Yes/No click, keyed by the short token
+# stored in the button value: (channel, thread_ts, user_id)
+_pending_confirmations: TTLCache[str, Tuple[str, str, str]] = TTLCache(
+    maxsize=10000, ttl=60 * 60
+)
+
+# Strong references to fire-and-forget tasks so they are not garbage collected early
+_background_tasks: Set[asyncio.Task] = set()
+
+# Keywords that trigger immediate canvas creation. Phrases are matched anywhere in
+# the text; English words only as whole words (so "created" or "makefile" do not fire).
+IMMEDIATE_TRIGGER_PHRASES = frozenset({
+    "まとめて", "canvas作成", "キャンバス作成", "作成して", "整理して", "要約して"
+})
+IMMEDIATE_TRIGGER_WORDS = frozenset({"summary", "create", "make"})
+
+# Single compiled pattern so each mention is scanned once, not once per keyword.
+# Case folding is restricted to ASCII: only the English words need it, so the raw
+# text is matched without a full Unicode lower() pass.
+_IMMEDIATE_TRIGGER_RE = re.compile(
+    "|".join(map(re.escape, sorted(IMMEDIATE_TRIGGER_PHRASES)))
+    + r"|\b(?:" + "|".join(map(re.escape, sorted(IMMEDIATE_TRIGGER_WORDS))) + r")\b",
+    re.IGNORECASE | re.ASCII
+)
+
+# Confirmation dialog, serialized once at import time. Only the button values
+# differ per request; they are filled into the JSON string by replacement.
+_CONFIRM_VALUE_PLACEHOLDER = "__CONFIRMATION_KEY__"
+_CONFIRM_BLOCKS_JSON: str = json.dumps([
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "📝 このスレッドの内容をCanvasにまとめますか？\n\n" +
+                    "⚠️ この操作はOpenAI APIを使用してトークンを消費します。"
+        }
+    },
+    {
+        "type": "actions",
+        "elements": [
+            {
+                "type": "button",
+                "text": {
+                    "type": "plain_text",
+                    "text": "Yes - Canvasを作成",
+                    "emoji": True
+                },
+                "style": "primary",
+                "action_id": "create_canvas_from_mention_yes",
+                "value": _CONFIRM_VALUE_PLACEHOLDER
+            },
+            {
+                "type": "button",
+                "text": {
+                    "type": "plain_text",
+                    "text": "No - キャンセル",
+                    "emoji": True
+                },
+                "action_id": "create_canvas_from_mention_no",
+                "value": _CONFIRM_VALUE_PLACEHOLDER
+            }
+        ]
+    }
+], ensure_ascii=False)
+
+
+def _build_confirm_blocks(value: str) -> str:
+    """Return the serialized Yes/No confirmation blocks with the button values filled in."""
+    # value is a URL-safe token, so it needs no JSON escaping
+    return _CONFIRM_BLOCKS_JSON.replace(_CONFIRM_VALUE_PLACEHOLDER, value)
+
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    """Release a finished background task and log its failure, if any."""
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background Slack call failed: %s", task.exception())
+
+
+def _post_ephemeral_in_background(client: AsyncWebClient, **kwargs: Any) -> None:
+    """Post an ephemeral message without waiting for the API call to complete."""
+    task = asyncio.create_task(client.chat_postEphemeral(**kwargs))
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+
+
+async def _pop_pending_confirmation(
+    body: Dict[str, Any], client: AsyncWebClient
+) -> Optional[Tuple[str, str, str]]:
+    """Look up the request behind a confirmation button, telling the user if it expired."""
+    pending = _pending_confirmations.pop(body["actions"][0]["value"])
+    if pending is None:
+        await client.chat_postEphemeral(
+            channel=body["channel"]["id"],
+            user=body["user"]["id"],
+            text="⌛ この確認メッセージは期限切れです。もう一度ボットをメンションしてください。",
+            thread_ts=body.get("container", {}).get("thread_ts")
+        )
+    return pending
+
 
 @app.event("app_mention")
 async def handle_app_mention(event: Dict[str, Any], say: Say, client: AsyncWebClient) -> None:
     """Handle mentions of the bot for canvas creation."""
     try:
-        text: str = event.get("text", "").lower()
+        text: str = event.get("text", "")
         user_id: str = event["user"]
         channel: str = event["channel"]
 
@@ -39,16 +154,11 @@ async def handle_app_mention(event: Dict[str, Any], say: Say, client: AsyncWebCl
         if "thread_ts" in event:
             thread_ts: str = event["thread_ts"]
 
-            # Keywords that trigger immediate canvas creation
-            immediate_trigger_words = [
-                "まとめて", "canvas作成", "キャンバス作成", "作成して", "整理して",
-                "要約して", "summary", "create", "make"
-            ]
-
             # Check if message contains immediate trigger words
-            if any(word in text for word in immediate_trigger_words):
-                # Send ephemeral processing message to user only
-                await client.chat_postEphemeral(
+            if _IMMEDIATE_TRIGGER_RE.search(text):
+                # Send ephemeral processing message to user only, overlapping with canvas creation
+                _post_ephemeral_in_background(
+                    client,
                     channel=channel,
                     user=user_id,
                     text="🔄 Canvasを作成中です。少々お待ちください...",
@@ -62,45 +172,12 @@ async def handle_app_mention(event: Dict[str, Any], say: Say, client: AsyncWebCl
                     user_id=user_id
                 )
 
-                logger.info(f"Canvas {canvas_id} created from app mention")
+                logger.info("Canvas %s created from app mention", canvas_id)
             else:
                 # Show confirmation dialog with Yes/No buttons (ephemeral)
-                blocks = [
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": "📝 このスレッドの内容をCanvasにまとめますか？\n\n" +
-                                    "⚠️ この操作はOpenAI APIを使用してトークンを消費します。"
-                        }
-                    },
-                    {
-                        "type": "actions",
-                        "elements": [
-                            {
-                                "type": "button",
-                                "text": {
-                                    "type": "plain_text",
-                                    "text": "Yes - Canvasを作成",
-                                    "emoji": True
-                                },
-                                "style": "primary",
-                                "action_id": "create_canvas_from_mention_yes",
-                                "value": f"{channel}|{thread_ts}|{user_id}"
-                            },
-                            {
-                                "type": "button",
-                                "text": {
-                                    "type": "plain_text",
-                                    "text": "No - キャンセル",
-                                    "emoji": True
-                                },
-                                "action_id": "create_canvas_from_mention_no",
-                                "value": f"{channel}|{thread_ts}|{user_id}"
-                            }
-                        ]
-                    }
-                ]
+                confirmation_key: str = secrets.token_urlsafe(8)
+                _pending_confirmations.set(confirmation_key, (channel, thread_ts, user_id))
+                blocks = _build_confirm_blocks(confirmation_key)
 
                 await client.chat_postEphemeral(
                     channel=channel,
@@ -121,14 +198,14 @@ async def handle_app_mention(event: Dict[str, Any], say: Say, client: AsyncWebCl
             )
 
     except Exception as e:
-        logger.error(f"Error handling app mention: {e}")
+        logger.error("Error handling app mention: %s", e)
 
 
 @app.event("message")
-async def handle_message_events(body: Dict[str, Any], logger) -> None:
+async def handle_message_events() -> None:
     """Handle general message events to avoid unhandled request warnings."""
-    # This is a catch-all for message events that aren't handled by specific patterns
-    # We don't need to do anything here, just acknowledge the event
+    # This is a catch-all for message events that aren't handled by specific patterns.
+    # It takes no arguments so Bolt does not build any listener kwargs for it.
     pass
 
 
@@ -137,13 +214,17 @@ async def handle_mention_yes_button(ack: Ack, body: Dict[str, Any], client: Asyn
     """Handle 'Yes' button click from thread mention."""
     await ack()
 
+    pending: Optional[Tuple[str, str, str]] = None
     try:
-        # Parse the button value
-        button_value: str = body["actions"][0]["value"]
-        channel, thread_ts, user_id = button_value.split("|")
-
-        # Send ephemeral processing message to user only
-        await client.chat_postEphemeral(
+        # Resolve the pending request from the button value
+        pending = await _pop_pending_confirmation(body, client)
+        if pending is None:
+            return
+        channel, thread_ts, user_id = pending
+
+        # Send ephemeral processing message to user only, overlapping with canvas creation
+        _post_ephemeral_in_background(
+            client,
             channel=channel,
             user=user_id,
             text="🔄 Canvasを作成中です。少々お待ちください...",
@@ -157,20 +238,19 @@ async def handle_mention_yes_button(ack: Ack, body: Dict[str, Any], client: Asyn
             user_id=user_id
         )
 
-        logger.info(f"Canvas {canvas_id} created from mention Yes button click")
+        logger.info("Canvas %s created from mention Yes button click", canvas_id)
 
     except Exception as e:
-        logger.error(f"Error handling mention Yes button: {e}")
+        logger.error("Error handling mention Yes button: %s", e)
         # Send error message to user only
-        try:
-            await client.chat_postEphemeral(
+        if pending is not None:
+            _post_ephemeral_in_background(
+                client,
                 channel=channel,
                 user=user_id,
                 text=f"❌ エラーが発生しました: {str(e)}",
                 thread_ts=thread_ts
             )
-        except Exception:
-            pass
 
 
 @app.action("create_canvas_from_mention_no")
@@ -179,9 +259,11 @@ async def handle_mention_no_button(ack: Ack, body: Dict[str, Any], client: Async
     await ack()
 
     try:
-        # Parse the button value
-        button_value: str = body["actions"][0]["value"]
-        channel, thread_ts, user_id = button_value.split("|")
+        # Resolve the pending request from the button value
+        pending = await _pop_pending_confirmation(body, client)
+        if pending is None:
+            return
+        channel, thread_ts, user_id = pending
 
         # Send ephemeral cancellation message to user only
         await client.chat_postEphemeral(
@@ -191,22 +273,41 @@ async def handle_mention_no_button(ack: Ack, body: Dict[str, Any], client: Async
             thread_ts=thread_ts
         )
 
-        logger.info(f"Canvas creation cancelled by user {user_id} from mention")
+        logger.info("Canvas creation cancelled by user %s from mention", user_id)
 
     except Exception as e:
-        logger.error(f"Error handling mention No button: {e}")
+        logger.error("Error handling mention No button: %s", e)
 
 
 async def main() -> None:
     """Main function to start the Slack app in Socket Mode."""
     try:
-        # Socket mode only
-        handler: AsyncSocketModeHandler = AsyncSocketModeHandler(app, settings.slack_app_token)
-        await handler.start_async()
+        # Socket mode only. Slack distributes events across all open connections
+        # of the app, so extra connections spread the load and add redundancy.
+        handlers: List[AsyncSocketModeHandler] = [
+            AsyncSocketModeHandler(app, settings.slack_app_token)
+            for _ in range(settings.slack_socket_mode_connections)
+        ]
+        # Warm-up lookups and opening the connections are independent round-trips
+        await asyncio.gather(
+            # Bolt builds its per-request clients from app.client's session
+            canvas_creator.bootstrap(app.client),
+            *(handler.start_async() for handler in handlers)
+        )
     except Exception as e:
-        logger.error(f"Error starting app: {e}")
+        logger.error("Error starting app: %s", e)
         raise
+    finally:
+        await canvas_creator.aclose()
+
+
+def run() -> None:
+    """Run the app, using the uvloop event loop when it is installed."""
+    if uvloop is not None:
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+    else:
+        asyncio.run(main())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
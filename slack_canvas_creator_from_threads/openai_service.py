@@ -1,49 +1,48 @@
 """OpenAI service for summarizing thread content."""
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any, Tuple
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional, Protocol
 
-from openai import OpenAI
-from openai.types.chat import ChatCompletion
+import httpx
+from openai import AsyncOpenAI
 
-from .config import settings
+from .cache import TTLCache
+from .config import get_settings
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TITLE = "スレッドまとめ"
 
-class OpenAIService:
-    """Service for interacting with OpenAI API."""
-
-    def __init__(self) -> None:
-        self.client = OpenAI(api_key=settings.openai_api_key)
-
-    async def summarize_thread_content(self, messages: List[Dict[str, Any]], thread_link: str = "") -> Tuple[str, str]:
-        """
-        Summarize thread content using OpenAI API.
+# Longer messages are cut in the prompt to bound prompt tokens (and latency/cost)
+_MAX_MESSAGE_CHARS = 4000
+_TRUNCATION_MARK = "…（以下省略）"
 
-        Args:
-            messages: List of message dictionaries containing text and user info
-            thread_link: Link to the original Slack thread
+# Parameters shared by every summary request, streamed or batched
+_MAX_COMPLETION_TOKENS = 2000
+_TEMPERATURE = 0.3
 
-        Returns:
-            Tuple of (title, content) suitable for Canvas
-        """
-        try:
-            # Format messages for the prompt
-            formatted_messages: List[str] = []
-            for msg in messages:
-                user: str = msg.get('user', 'Unknown')
-                text: str = msg.get('text', '')
-                formatted_messages.append(f"[{user}]: {text}")
+# Connection pool and timeouts of the HTTP client shared by all OpenAI calls.
+# The read timeout applies between streamed chunks, not to the whole response.
+_HTTP_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=64)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
 
-            thread_content: str = "\n".join(formatted_messages)
+# Terminal states of an OpenAI batch job
+_BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
 
-            prompt: str = f"""
-以下はSlackスレッドでの会話内容です。この内容を読んで、主要なトピックやポイントを整理し、Canvas形式でまとめてください。
+# Whole response wrapped in a ``` or ```markdown code block
+_FENCE_RE = re.compile(r"\A\s*```(?:markdown)?(.*?)```\s*\Z", re.DOTALL)
 
-会話内容:
-{thread_content}
+# Instructions and output example are kept in the system message so that every
+# request starts with the same byte-identical prefix, which OpenAI caches server-side.
+_SYSTEM_PROMPT = """あなたはSlackスレッドの内容を整理してCanvas用のMarkdownドキュメントを作成するアシスタントです。会話の内容を適切に要約し、分かりやすいタイトルも生成してください。
 
 以下の形式で出力してください：
 
@@ -57,7 +56,7 @@ class OpenAIService:
 5. 今後の対策（会話の内容から推測される今後必要な対策や改善点）
 6. 参考情報やリンク（もしあれば）
 
-最後に、元のスレッドへのリンクを含めてください。
+最後に、ユーザーが指定する元のスレッドへのリンクを含めてください。
 
 出力例：
 TITLE: プロジェクトAの進捗確認と次のステップ
@@ -86,22 +85,230 @@ TITLE: プロジェクトAの進捗確認と次のステップ
 - リンク2
 
 ---
-**元のスレッド**: [こちらをクリック]({thread_link})
-
-Markdown形式で出力してください。コードブロック（```）で囲まずに、直接Markdownテキストを出力してください。
-"""
-
-            response: ChatCompletion = self.client.chat.completions.create(
-                model=settings.openai_model,
-                messages=[
-                    {"role": "system", "content": "あなたはSlackスレッドの内容を整理してCanvas用のMarkdownドキュメントを作成するアシスタントです。会話の内容を適切に要約し、分かりやすいタイトルも生成してください。"},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.3
+**元のスレッド**: [こちらをクリック](元のスレッドのリンク)
+
+Markdown形式で出力してください。コードブロック（```）で囲まずに、直接Markdownテキストを出力してください。"""
+
+
+_PROMPT_TEMPLATE = """以下はSlackスレッドでの会話内容です。この内容を読んで、主要なトピックやポイントを整理し、Canvas形式でまとめてください。
+
+元のスレッドのリンク: {thread_link}
+
+会話内容:
+{thread_content}"""
+
+# Used when a cached summary exists and the thread only gained new messages
+_UPDATE_PROMPT_TEMPLATE = """以下は同じSlackスレッドについての既存のまとめと、その後にスレッドに追加された会話内容です。既存のまとめに追加された会話の内容を反映し、同じ形式でまとめ直してください。
+
+元のスレッドのリンク: {thread_link}
+
+既存のまとめ:
+TITLE: {title}
+{content}
+
+追加された会話内容:
+{new_content}"""
+
+
+@dataclass(frozen=True)
+class ThreadContent:
+    """Messages of one thread to summarize, with a link back to it."""
+
+    messages: List[Dict[str, Any]]
+    thread_link: str = ""
+
+
+@dataclass(frozen=True)
+class CachedSummary:
+    """Summary generated for the first message_count messages of a thread."""
+
+    message_count: int
+    digest: str  # Hash of the formatted transcript those messages produced
+    title: str
+    content: str
+
+
+class SummaryCache(Protocol):
+    """Storage for generated summaries, keyed by thread (e.g. "CHANNEL:THREAD_TS")."""
+
+    def get(self, key: str) -> Optional[CachedSummary]:
+        ...
+
+    def set(self, key: str, value: CachedSummary) -> None:
+        ...
+
+
+def _transcript_digest(lines: List[str]) -> str:
+    """Hash formatted transcript lines to detect edits or deletions in a cached prefix."""
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text without a tokenizer.
+
+    Japanese text is close to one token per character and English text is
+    well below that, so the character count is used as a conservative bound.
+    """
+    return len(text)
+
+
+class _RateLimiter:
+    """
+    Token-bucket throttle for the OpenAI requests-per-minute and tokens-per-minute limits.
+
+    Both buckets refill continuously; acquire() waits until they can cover a
+    request, so bursts are smoothed out instead of being rejected with 429s.
+    """
+
+    def __init__(self, max_requests_per_minute: int, max_tokens_per_minute: int) -> None:
+        self._max_requests: float = float(max_requests_per_minute)
+        self._max_tokens: float = float(max_tokens_per_minute)
+        self._available_requests: float = self._max_requests
+        self._available_tokens: float = self._max_tokens
+        self._last_update: float = time.monotonic()
+        # Serializes waiters so capacity is granted in arrival order
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self._available_requests = min(
+            self._max_requests, self._available_requests + elapsed * self._max_requests / 60
+        )
+        self._available_tokens = min(
+            self._max_tokens, self._available_tokens + elapsed * self._max_tokens / 60
+        )
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until a request consuming the given number of tokens fits within the limits.
+
+        Args:
+            tokens: Estimated prompt tokens plus the completion token budget
+        """
+        # A single request larger than the whole budget still has to go through eventually
+        needed_tokens = min(float(tokens), self._max_tokens)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._available_requests >= 1 and self._available_tokens >= needed_tokens:
+                    self._available_requests -= 1
+                    self._available_tokens -= needed_tokens
+                    return
+
+                wait_seconds = max(
+                    (1 - self._available_requests) * 60 / self._max_requests,
+                    (needed_tokens - self._available_tokens) * 60 / self._max_tokens
+                )
+                logger.info("Throttling OpenAI request for %.2fs", wait_seconds)
+                await asyncio.sleep(wait_seconds)
+
+
+class OpenAIService:
+    """Service for interacting with OpenAI API."""
+
+    def __init__(self, summary_cache: Optional[SummaryCache] = None) -> None:
+        settings = get_settings()
+        # The SDK retries 429/5xx and connection errors with jittered exponential backoff
+        self.client: AsyncOpenAI = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            max_retries=settings.openai_max_retries,
+            http_client=httpx.AsyncClient(
+                limits=_HTTP_LIMITS,
+                timeout=_HTTP_TIMEOUT,
+                follow_redirects=True
+            )
+        )
+        self._rate_limiter: _RateLimiter = _RateLimiter(
+            settings.openai_max_requests_per_minute,
+            settings.openai_max_tokens_per_minute
+        )
+        self.summary_cache: SummaryCache = summary_cache or TTLCache(maxsize=256, ttl=24 * 60 * 60)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self.client.close()
+
+    async def summarize_thread_content(
+        self,
+        messages: List[Dict[str, Any]],
+        thread_link: str = "",
+        cache_key: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Summarize thread content using OpenAI API.
+
+        With a cache_key, an unchanged thread is answered from the summary cache,
+        and a thread that only gained new messages is summarized incrementally
+        from the cached summary plus the new messages.
+
+        Args:
+            messages: List of message dictionaries containing text and user info
+            thread_link: Link to the original Slack thread
+            cache_key: Optional key identifying the thread for summary caching
+
+        Returns:
+            Tuple of (title, content) suitable for Canvas
+        """
+        try:
+            local_summary: Optional[Tuple[str, str]] = self._summarize_locally(messages, thread_link)
+            if local_summary is not None:
+                logger.info("Thread with %d messages is too short to summarize, skipping OpenAI", len(messages))
+                return local_summary
+
+            # Format messages for the prompt
+            formatted_messages: List[str] = self._format_transcript(messages)
+
+            cached: Optional[CachedSummary] = self.summary_cache.get(cache_key) if cache_key else None
+            if cached is not None and (
+                cached.message_count > len(formatted_messages)
+                or cached.digest != _transcript_digest(formatted_messages[:cached.message_count])
+            ):
+                # Earlier messages were edited or deleted; summarize from scratch
+                cached = None
+
+            if cached is not None:
+                # Messages addressed to the bot, such as the "@bot まとめて" that asked
+                # for this canvas, are requests rather than discussion
+                new_messages: List[Dict[str, Any]] = [msg for msg in messages if msg.get('text')][cached.message_count:]
+                new_lines: List[str] = self._format_transcript(
+                    [msg for msg in new_messages if not msg.get('mentions_bot')]
+                )
+                if not new_lines:
+                    logger.info("Using cached summary for %s", cache_key)
+                    return cached.title, cached.content
+
+                # Only the messages added since the cached summary are sent
+                logger.info("Updating cached summary for %s with %d new messages", cache_key, len(new_lines))
+                prompt: str = _UPDATE_PROMPT_TEMPLATE.format(
+                    thread_link=thread_link,
+                    title=cached.title,
+                    content=cached.content,
+                    new_content="\n".join(new_lines)
+                )
+            else:
+                prompt = _PROMPT_TEMPLATE.format(
+                    thread_link=thread_link,
+                    thread_content="\n".join(formatted_messages)
+                )
+
+            request: Dict[str, Any] = self._build_summary_request(prompt)
+
+            # Stay under the RPM/TPM limits proactively instead of waiting on 429 retries
+            await self._rate_limiter.acquire(
+                sum(_estimate_tokens(m["content"]) for m in request["messages"]) + request["max_tokens"]
             )
 
-            full_response: str = response.choices[0].message.content or ""
+            # Streamed, so the HTTP read timeout applies between chunks rather
+            # than to the whole generation of a long document
+            stream = await self.client.chat.completions.create(**request, stream=True)
+            full_response: str = "".join([
+                chunk.choices[0].delta.content
+                async for chunk in stream
+                if chunk.choices and chunk.choices[0].delta.content
+            ])
 
             # コードブロックで囲まれている場合は除去
             full_response = self._clean_markdown_response(full_response)
@@ -109,13 +316,214 @@ Markdown形式で出力してください。コードブロック（```）で囲
             # タイトルとコンテンツを分離
             title, content = self._extract_title_and_content(full_response)
 
+            if cache_key:
+                self.summary_cache.set(cache_key, CachedSummary(
+                    message_count=len(formatted_messages),
+                    digest=_transcript_digest(formatted_messages),
+                    title=title,
+                    content=content
+                ))
+
             logger.info("Successfully generated thread summary with title")
             return title, content
 
         except Exception as e:
-            logger.error(f"Error summarizing thread content: {e}")
+            logger.error("Error summarizing thread content: %s", e)
             raise
 
+    async def summarize_threads(self, threads: List[ThreadContent]) -> List[Tuple[str, str]]:
+        """
+        Summarize several threads concurrently through the regular endpoint.
+
+        At most settings.openai_concurrency requests are in flight at once; the
+        rate limiter still spaces them out to stay within the RPM/TPM limits.
+
+        Args:
+            threads: Threads to summarize
+
+        Returns:
+            List of (title, content) tuples in the same order as threads
+        """
+        semaphore = asyncio.Semaphore(get_settings().openai_concurrency)
+
+        async def summarize(thread: ThreadContent) -> Tuple[str, str]:
+            async with semaphore:
+                return await self.summarize_thread_content(thread.messages, thread.thread_link)
+
+        return list(await asyncio.gather(*(summarize(thread) for thread in threads)))
+
+    async def summarize_threads_batch(self, threads: List[ThreadContent]) -> List[Tuple[str, str]]:
+        """
+        Summarize many threads at once through the OpenAI Batch API.
+
+        Batch requests cost half as much and have their own rate limits, but may
+        take up to the 24h completion window, so this is meant for bulk jobs such
+        as nightly digests. With fewer than settings.openai_batch_threshold
+        threads the regular endpoint is used instead. Threads the batch could not
+        summarize are retried through the regular endpoint.
+
+        Args:
+            threads: Threads to summarize
+
+        Returns:
+            List of (title, content) tuples in the same order as threads
+        """
+        settings = get_settings()
+        # Trivially short threads are summarized locally and never sent in the batch
+        results: Dict[int, Tuple[str, str]] = {
+            index: summary
+            for index, thread in enumerate(threads)
+            if (summary := self._summarize_locally(thread.messages, thread.thread_link)) is not None
+        }
+        if len(threads) - len(results) < settings.openai_batch_threshold:
+            return await self.summarize_threads(threads)
+
+        try:
+            lines: List[str] = [
+                json.dumps({
+                    "custom_id": str(index),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._build_summary_request(_PROMPT_TEMPLATE.format(
+                        thread_link=thread.thread_link,
+                        thread_content="\n".join(self._format_transcript(thread.messages))
+                    ))
+                }, ensure_ascii=False)
+                for index, thread in enumerate(threads)
+                if index not in results
+            ]
+            input_file = await self.client.files.create(
+                file=("threads.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = await self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            logger.info("Created OpenAI batch %s for %d threads", batch.id, len(lines))
+
+            while batch.status not in _BATCH_FINAL_STATUSES:
+                await asyncio.sleep(settings.openai_batch_poll_interval)
+                batch = await self.client.batches.retrieve(batch.id)
+
+            logger.info("OpenAI batch %s finished with status %s", batch.id, batch.status)
+
+            # An expired or cancelled batch still has output for the requests it completed
+            if batch.output_file_id:
+                output = await self.client.files.content(batch.output_file_id)
+                for line in output.text.splitlines():
+                    if not line:
+                        continue
+                    record: Dict[str, Any] = json.loads(line)
+                    response: Dict[str, Any] = record.get("response") or {}
+                    if response.get("status_code") != 200:
+                        logger.warning("Batch request %s failed: %s", record.get('custom_id'), record.get('error'))
+                        continue
+                    content: str = response["body"]["choices"][0]["message"]["content"] or ""
+                    results[int(record["custom_id"])] = self._extract_title_and_content(
+                        self._clean_markdown_response(content)
+                    )
+
+            missing: List[int] = [index for index in range(len(threads)) if index not in results]
+            if missing:
+                retried = await self.summarize_threads([threads[index] for index in missing])
+                results.update(zip(missing, retried))
+
+            return [results[index] for index in range(len(threads))]
+
+        except Exception as e:
+            logger.error("Error summarizing threads in batch: %s", e)
+            raise
+
+    def _summarize_locally(self, messages: List[Dict[str, Any]], thread_link: str) -> Optional[Tuple[str, str]]:
+        """
+        Build the summary of a trivially short thread without calling OpenAI.
+
+        Threads with fewer than settings.openai_min_messages messages or fewer
+        than settings.openai_min_thread_chars characters are listed as they are.
+
+        Args:
+            messages: List of message dictionaries containing text and user info
+            thread_link: Link to the original Slack thread
+
+        Returns:
+            Tuple of (title, content), or None if the thread should be summarized by OpenAI
+        """
+        settings = get_settings()
+        entries: List[Tuple[str, str]] = [
+            (msg.get('user', 'Unknown'), text)
+            for msg in messages
+            if (text := (msg.get('text') or '').strip())
+        ]
+        if (
+            len(entries) >= settings.openai_min_messages
+            and sum(len(text) for _, text in entries) >= settings.openai_min_thread_chars
+        ):
+            return None
+
+        title: str = (entries[0][1].split('\n', 1)[0][:40] if entries else "") or DEFAULT_TITLE
+        # Same "[user]: text" attribution as the transcript sent to OpenAI
+        lines: List[str] = [f"- [{user}]: {text}".replace('\n', '\n  ') for user, text in entries]
+        if thread_link:
+            lines.append(f"\n---\n**元のスレッド**: [こちらをクリック]({thread_link})")
+        return title, "\n".join(lines)
+
+    def _build_summary_request(self, prompt: str) -> Dict[str, Any]:
+        """
+        Build the chat completion parameters for a summary prompt.
+
+        Short prompts go to the small model, which decodes faster and costs
+        less; long prompts use the configured model. Both get the full
+        completion budget so the document and its trailing thread link are
+        never cut off.
+
+        Args:
+            prompt: User prompt built from one of the prompt templates
+
+        Returns:
+            Keyword arguments for chat.completions.create, also used as a batch request body
+        """
+        settings = get_settings()
+        request_messages: List[Dict[str, str]] = [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        input_tokens: int = sum(_estimate_tokens(m["content"]) for m in request_messages)
+
+        model: str = (
+            settings.openai_small_model
+            if input_tokens < settings.openai_small_model_max_input_tokens
+            else settings.openai_model
+        )
+
+        return {
+            "model": model,
+            "messages": request_messages,
+            "max_tokens": _MAX_COMPLETION_TOKENS,
+            "temperature": _TEMPERATURE
+        }
+
+    def _format_transcript(self, messages: List[Dict[str, Any]]) -> List[str]:
+        """
+        Format thread messages as "[user]: text" transcript lines.
+
+        Messages without text are skipped since they only cost prompt tokens,
+        and very long messages are truncated.
+
+        Args:
+            messages: List of message dictionaries containing text and user info
+
+        Returns:
+            Transcript lines in thread order
+        """
+        return [
+            f"[{msg.get('user', 'Unknown')}]: "
+            + (text if len(text) <= _MAX_MESSAGE_CHARS else text[:_MAX_MESSAGE_CHARS] + _TRUNCATION_MARK)
+            for msg in messages
+            if (text := msg.get('text'))
+        ]
+
     def _clean_markdown_response(self, content: str) -> str:
         """
         OpenAIの応答からMarkdownコードブロックを除去する
@@ -126,17 +534,11 @@ Markdown形式で出力してください。コードブロック（```）で囲
         Returns:
             クリーンなMarkdownテキスト
         """
-        content = content.strip()
-
-        # ```markdown ... ``` パターンを除去
-        if content.startswith('```markdown') and content.endswith('```'):
-            content = content[11:-3].strip()
-
-        # ``` ... ``` パターンを除去
-        elif content.startswith('```') and content.endswith('```'):
-            content = content[3:-3].strip()
-
-        return content
+        # ```markdown ... ``` / ``` ... ``` パターンを一度の走査で除去
+        match = _FENCE_RE.match(content)
+        if match:
+            return match.group(1).strip()
+        return content.strip()
 
     def _extract_title_and_content(self, response: str) -> Tuple[str, str]:
         """
@@ -148,15 +550,20 @@ Markdown形式で出力してください。コードブロック（```）で囲
         Returns:
             (title, content) のタプル
         """
-        lines = response.split('\n')
-        title = "スレッドまとめ"  # デフォルトタイトル
-        content_lines = []
+        if response.startswith('TITLE:'):
+            title_line, _, content = response.partition('\n')
+            return title_line[6:].strip(), content.strip()
+
+        # TITLE行が先頭にない場合（前置きの文章がある場合など）はその行だけを取り除く
+        index = response.find('\nTITLE:')
+        if index == -1:
+            return DEFAULT_TITLE, response.strip()
+
+        title_line, _, rest = response[index + 1:].partition('\n')
+        return title_line[6:].strip(), f"{response[:index]}\n{rest}".strip()
 
-        for i, line in enumerate(lines):
-            if line.startswith('TITLE:'):
-                title = line[6:].strip()
-            elif i > 0 or not line.startswith('TITLE:'):
-                content_lines.append(line)
 
-        content = '\n'.join(content_lines).strip()
-        return title, content
+@lru_cache(maxsize=1)
+def get_openai_service() -> OpenAIService:
+    """Return the process-wide OpenAIService, so its OpenAI connection pool is reused by every request."""
+    return OpenAIService()
@@ -1,23 +1,147 @@
 """Slack service for handling thread operations and Canvas creation."""
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
-from slack_sdk import WebClient
+import aiohttp
+from slack_sdk.web.async_client import AsyncWebClient
 from slack_sdk.errors import SlackApiError
-from slack_sdk.web import SlackResponse
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
 
-from .config import settings
+from .config import get_settings
 
 
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by all Slack Web API calls
+_MAX_CONNECTIONS = 256
+_DNS_CACHE_TTL = 300
+
+# Slack mrkdwn markup: user/channel mentions (<@U123|name>, <#C123|name>),
+# special mentions (<!here>) and links (<https://...|label>)
+_SLACK_MARKUP_RE = re.compile(r"<([@#!]?)([^<>|]+)(?:\|([^<>]*))?>")
+
+
+def _plain_slack_markup(match: "re.Match[str]") -> str:
+    sigil, target, label = match.groups()
+    if sigil == "!":
+        return label or f"@{target}"
+    return f"{sigil}{label or target}"
+
+
+def _strip_slack_markup(text: str) -> str:
+    """Replace Slack mrkdwn mentions and links with plain text and unescape it."""
+    text = _SLACK_MARKUP_RE.sub(_plain_slack_markup, text)
+    return text.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
+
 
 class SlackService:
     """Service for Slack API operations."""
 
     def __init__(self) -> None:
-        self.client: WebClient = WebClient(token=settings.slack_bot_token)
+        self.client: AsyncWebClient = AsyncWebClient(token=get_settings().slack_bot_token)
+        # Workspace URL and team ID never change for the bot's lifetime, so they
+        # are resolved once; the lock keeps concurrent first requests to one auth.test
+        self._workspace_url: Optional[str] = None
+        self._team_id: Optional[str] = None
+        self._bot_user_id: Optional[str] = None
+        self._workspace_info_lock: asyncio.Lock = asyncio.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Clients using the shared session, detached again on close
+        self._session_clients: List[AsyncWebClient] = []
+
+    async def bootstrap(self, *clients: AsyncWebClient) -> None:
+        """
+        Open the shared connection pool and resolve the workspace info ahead of
+        the first canvas request.
+
+        Args:
+            clients: Other clients to share the connection pool with, such as the Bolt app's
+        """
+        # aiohttp sessions must be created inside the running event loop. Until
+        # this runs, the SDK falls back to a short-lived session per call.
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=_MAX_CONNECTIONS, ttl_dns_cache=_DNS_CACHE_TTL)
+            )
+            self._session_clients = [self.client, *clients]
+            for client in self._session_clients:
+                client.session = self._session
+
+        workspace_url, team_id = await self._get_workspace_info()
+        logger.info("Workspace URL: %s, Team ID: %s", workspace_url, team_id)
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        if self._session is not None:
+            for client in self._session_clients:
+                client.session = None
+            self._session_clients = []
+            await self._session.close()
+            self._session = None
+
+    async def _get_workspace_info(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Get the workspace URL and team ID, calling the Slack API only until they are known.
+
+        Returns:
+            Tuple of (workspace_url, team_id). workspace_url has no trailing slash
+            (e.g., https://yusa-group.slack.com). Values that could not be resolved are None.
+        """
+        if self._workspace_url is not None:
+            return self._workspace_url, self._team_id
+
+        async with self._workspace_info_lock:
+            # Another request may have resolved it while we were waiting
+            if self._workspace_url is not None:
+                return self._workspace_url, self._team_id
+
+            try:
+                auth_response: AsyncSlackResponse = await self.client.auth_test()
+                self._bot_user_id = auth_response.get("user_id")
+                team_id: Optional[str] = auth_response.get("team_id")
+                team_url: str = auth_response.get("url", "")
+
+                # Extract workspace domain from team URL (e.g., https://yusa-group.slack.com/)
+                if team_url:
+                    workspace_url = team_url.rstrip('/')
+                else:
+                    # Fallback: try to get team domain from team info
+                    team_info_response: AsyncSlackResponse = await self.client.team_info()
+                    team_domain = team_info_response.get("team", {}).get("domain", "")
+                    if not team_domain:
+                        # Not cached, so the lookup is retried on the next request
+                        return None, team_id
+                    workspace_url = f"https://{team_domain}.slack.com"
+
+            except Exception as e:
+                logger.warning("Could not get workspace info: %s", e)
+                return None, None
+
+            self._team_id = team_id
+            self._workspace_url = workspace_url
+            return workspace_url, team_id
+
+    def _normalize_text(self, text: str) -> str:
+        """
+        Turn a message's Slack mrkdwn into plain text.
+
+        The bot's own mention is removed, since it is how the thread asked for
+        the canvas rather than content. It is known once bootstrap() or the
+        first thread link lookup has run; before that it is left as "@U...".
+
+        Args:
+            text: Message text as returned by the Slack API
+
+        Returns:
+            Plain text
+        """
+        if self._bot_user_id:
+            text = re.sub(rf"<@{re.escape(self._bot_user_id)}>\s*", "", text)
+        return _strip_slack_markup(text).strip()
 
     async def get_thread_messages(self, channel: str, thread_ts: str) -> List[Dict[str, Any]]:
         """
@@ -28,30 +152,48 @@ class SlackService:
             thread_ts: Thread timestamp
 
         Returns:
-            List of message dictionaries
+            List of message dictionaries with user, plain text, ts and whether
+            the message mentions the bot (mentions_bot)
         """
         try:
-            response: SlackResponse = self.client.conversations_replies(
-                channel=channel,
-                ts=thread_ts,
-                inclusive=True
-            )
-
+            bot_mention: Optional[str] = f"<@{self._bot_user_id}>" if self._bot_user_id else None
             messages: List[Dict[str, Any]] = []
-            for message in response["messages"]:
-                # Skip bot messages and only include text messages
-                if not message.get("bot_id") and message.get("text"):
-                    messages.append({
+            cursor: Optional[str] = None
+
+            # Replies are paginated; follow the cursor so long threads are not truncated
+            while True:
+                response: AsyncSlackResponse = await self.client.conversations_replies(
+                    channel=channel,
+                    ts=thread_ts,
+                    inclusive=True,
+                    limit=200,
+                    cursor=cursor
+                )
+
+                # Skip bot messages and only include text messages. Every page starts
+                # with the parent message again, so it is taken from the first page only.
+                messages.extend(
+                    {
                         "user": message.get("user", "Unknown"),
-                        "text": message.get("text", ""),
-                        "ts": message.get("ts", "")
-                    })
-
-            logger.info(f"Retrieved {len(messages)} messages from thread {thread_ts}")
+                        "text": text,
+                        "ts": message.get("ts", ""),
+                        "mentions_bot": bot_mention is not None and bot_mention in message["text"]
+                    }
+                    for message in response["messages"]
+                    if (cursor is None or message.get("ts") != thread_ts)
+                    and not message.get("bot_id")
+                    and (text := self._normalize_text(message.get("text") or ""))
+                )
+
+                cursor = (response.get("response_metadata") or {}).get("next_cursor")
+                if not cursor:
+                    break
+
+            logger.info("Retrieved %d messages from thread %s", len(messages), thread_ts)
             return messages
 
         except SlackApiError as e:
-            logger.error(f"Error getting thread messages: {e.response['error']}")
+            logger.error("Error getting thread messages: %s", e.response['error'])
             raise
 
     async def get_thread_link(self, channel: str, thread_ts: str) -> str:
@@ -66,35 +208,24 @@ class SlackService:
             URL to the thread that opens in Slack app
         """
         try:
-            # Get workspace info
-            auth_response: SlackResponse = self.client.auth_test()
-            team_url: str = auth_response.get("url", "")
-
-            # Extract workspace domain from team URL (e.g., https://yusa-group.slack.com/)
-            if team_url:
-                workspace_domain = team_url.rstrip('/')
-            else:
-                # Fallback: try to get team domain from team info
-                team_info_response: SlackResponse = self.client.team_info()
-                team_domain = team_info_response.get("team", {}).get("domain", "")
-                workspace_domain = f"https://{team_domain}.slack.com" if team_domain else "https://slack.com"
+            # Workspace URL is cached after the first lookup (or at startup),
+            # so the link is normally built without any Slack API call
+            workspace_url, _ = await self._get_workspace_info()
+            workspace_domain: str = workspace_url or "https://slack.com"
 
-            # Convert timestamp to p-format for URL (remove dot and pad with zeros)
-            ts_parts = thread_ts.split('.')
-            p_timestamp = f"p{ts_parts[0]}{ts_parts[1].ljust(6, '0')}"
+            # Convert timestamp to p-format for URL (remove dot and pad/cap fraction to 6 digits)
+            seconds, _, fraction = thread_ts.partition('.')
+            p_timestamp = f"p{seconds}{fraction.ljust(6, '0')[:6]}"
 
             # Generate link in format: https://workspace.slack.com/archives/CHANNEL/pTIMESTAMP
             thread_link = f"{workspace_domain}/archives/{channel}/{p_timestamp}"
 
-            logger.info(f"Generated thread link: {thread_link}")
+            logger.info("Generated thread link: %s", thread_link)
             return thread_link
 
-        except SlackApiError as e:
-            logger.error(f"Error generating thread link: {e.response['error']}")
-            # Return a fallback link
-            return f"https://slack.com/archives/{channel}/{thread_ts.replace('.', '')}"
         except Exception as e:
-            logger.error(f"Unexpected error generating thread link: {e}")
+            logger.error("Unexpected error generating thread link: %s", e)
+            # Return a fallback link
             return f"https://slack.com/archives/{channel}/{thread_ts.replace('.', '')}"
 
     async def send_processing_message(self, channel: str, user_id: str, thread_ts: str) -> str:
@@ -127,7 +258,7 @@ class SlackService:
             Canvas ID
         """
         try:
-            response: SlackResponse = self.client.canvases_create(
+            response: AsyncSlackResponse = await self.client.canvases_create(
                 title=title,
                 document_content={
                     "type": "markdown",
@@ -135,7 +266,7 @@ class SlackService:
                 }
             )
 
-            logger.info(f"Canvas API response: {response}")
+            logger.debug("Canvas API response ok=%s keys=%s", response.get("ok"), list(response.data.keys()))
 
             # Check if response contains canvas data
             if not response.get("ok"):
@@ -151,14 +282,14 @@ class SlackService:
             if not canvas_id:
                 raise SlackApiError("Canvas creation response missing canvas ID", response)
 
-            logger.info(f"Created canvas with ID: {canvas_id}")
+            logger.info("Created canvas with ID: %s", canvas_id)
             return canvas_id
 
         except SlackApiError as e:
-            logger.error(f"Error creating canvas: {e.response['error']}")
+            logger.error("Error creating canvas: %s", e.response['error'])
             raise
         except Exception as e:
-            logger.error(f"Unexpected error creating canvas: {e}")
+            logger.error("Unexpected error creating canvas: %s", e)
             raise
 
     async def create_canvas_fallback(self, title: str, content: str, channel: str, user_id: str) -> str:
@@ -179,7 +310,7 @@ class SlackService:
             file_content = f"# {title}\n\n{content}"
 
             # Upload as file using the newer API
-            response = self.client.files_upload_v2(
+            response = await self.client.files_upload_v2(
                 channel=channel,
                 content=file_content,
                 filename=f"{title}.md",
@@ -189,13 +320,13 @@ class SlackService:
 
             if response["ok"]:
                 file_id = response["file"]["id"]
-                logger.info(f"Created markdown file with ID: {file_id}")
+                logger.info("Created markdown file with ID: %s", file_id)
                 return file_id
             else:
                 raise SlackApiError(f"File upload failed: {response.get('error')}", response)
 
         except SlackApiError as e:
-            logger.error(f"Error uploading file: {e.response['error']}")
+            logger.error("Error uploading file: %s", e.response['error'])
             raise
 
     async def share_canvas_with_user(self, canvas_id: str, user_id: str) -> None:
@@ -207,16 +338,16 @@ class SlackService:
             user_id: User ID to give access to
         """
         try:
-            self.client.canvases_access_set(
+            await self.client.canvases_access_set(
                 canvas_id=canvas_id,
                 access_level="write",
                 user_ids=[user_id]
             )
 
-            logger.info(f"Granted write access to user {user_id} for canvas {canvas_id}")
+            logger.info("Granted write access to user %s for canvas %s", user_id, canvas_id)
 
         except SlackApiError as e:
-            logger.error(f"Error sharing canvas: {e.response['error']}")
+            logger.error("Error sharing canvas: %s", e.response['error'])
             raise
 
     async def send_canvas_link(self, channel: str, user_id: str, canvas_id: str, thread_ts: Optional[str] = None) -> None:
@@ -231,29 +362,14 @@ class SlackService:
         """
         try:
             # Canvas URLの正しい形式: https://workspace.slack.com/docs/TEAM_ID/CANVAS_ID
-            # チーム情報を取得して正確なURLを生成
-
-            workspace_url = None
-            team_id = None
-
-            try:
-                # チーム情報を取得（team:read権限は不要、auth.testで代用）
-                auth_response = self.client.auth_test()
-                if auth_response.get("ok"):
-                    team_id = auth_response.get("team_id")
-                    team_url = auth_response.get("url")  # https://workspace.slack.com/
-                    if team_url:
-                        # URLから正しいワークスペースドメインを抽出
-                        workspace_url = team_url.rstrip('/')
-                        logger.info(f"Workspace URL: {workspace_url}, Team ID: {team_id}")
-            except Exception as e:
-                logger.warning(f"Could not get workspace info: {e}")
+            # ワークスペース情報はキャッシュ済みの値を使う（未取得の場合のみauth.testを呼ぶ）
+            workspace_url, team_id = await self._get_workspace_info()
 
             # 正しいCanvas URL形式を生成
             canvas_url = None
             if workspace_url and team_id:
                 canvas_url = f"{workspace_url}/docs/{team_id}/{canvas_id}"
-                logger.info(f"Generated Canvas URL: {canvas_url}")
+                logger.info("Generated Canvas URL: %s", canvas_url)
 
             # Create simple message with Canvas link
             if canvas_url:
@@ -262,16 +378,16 @@ class SlackService:
                 # フォールバック: ワークスペース情報が取得できない場合
                 message: str = f"<@{user_id}> ✅ スレッドの内容をまとめたCanvasを作成しました！\n\nCanvas ID: `{canvas_id}`\nSlack内で検索してアクセスしてください。"
 
-            self.client.chat_postMessage(
+            await self.client.chat_postMessage(
                 channel=channel,
                 text=message,
                 thread_ts=thread_ts
             )
 
-            logger.info(f"Sent canvas link to user {user_id}")
+            logger.info("Sent canvas link to user %s", user_id)
 
         except SlackApiError as e:
-            logger.error(f"Error sending canvas link: {e.response['error']}")
+            logger.error("Error sending canvas link: %s", e.response['error'])
             raise
 
     async def send_ephemeral_message(self, channel: str, user_id: str, text: str, blocks: Optional[List[Dict[str, Any]]] = None, thread_ts: Optional[str] = None) -> None:
@@ -298,10 +414,16 @@ class SlackService:
             if thread_ts:
                 kwargs["thread_ts"] = thread_ts
 
-            self.client.chat_postEphemeral(**kwargs)
+            await self.client.chat_postEphemeral(**kwargs)
 
-            logger.info(f"Sent ephemeral message to user {user_id}")
+            logger.info("Sent ephemeral message to user %s", user_id)
 
         except SlackApiError as e:
-            logger.error(f"Error sending ephemeral message: {e.response['error']}")
+            logger.error("Error sending ephemeral message: %s", e.response['error'])
             raise
+
+
+@lru_cache(maxsize=1)
+def get_slack_service() -> SlackService:
+    """Return the process-wide SlackService, so its Slack connection pool is reused by every request."""
+    return SlackService()
@@ -0,0 +1,99 @@
+"""Tests for the in-memory TTL cache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from slack_canvas_creator_from_threads import cache
+from slack_canvas_creator_from_threads.cache import TTLCache
+
+
+class FakeClock:
+    """Manually advanced replacement for time.monotonic."""
+
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=fake_clock))
+    return fake_clock
+
+
+def test_get_returns_value_until_expiry(clock: FakeClock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+
+    clock.now += 59.9
+    assert ttl_cache.get("a") == 1
+
+    clock.now += 0.1
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("a", -1) == -1
+    assert len(ttl_cache) == 0
+
+
+def test_set_evicts_oldest_entries_beyond_maxsize(clock: FakeClock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.get("b") == 2
+    assert ttl_cache.get("c") == 3
+    assert len(ttl_cache) == 2
+
+
+def test_set_drops_expired_entries(clock: FakeClock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+
+    clock.now += 60
+    ttl_cache.set("c", 3)
+
+    assert len(ttl_cache) == 1
+    assert ttl_cache.get("c") == 3
+
+
+def test_pop_returns_value_once(clock: FakeClock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+
+    assert ttl_cache.pop("a") == 1
+    assert ttl_cache.pop("a") is None
+    assert ttl_cache.pop("a", -1) == -1
+
+
+def test_pop_of_expired_key_returns_default_and_removes_it(clock: FakeClock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+
+    clock.now += 60
+    assert ttl_cache.pop("a", -1) == -1
+    assert len(ttl_cache) == 0
+
+
+def test_reset_refreshes_ttl_and_eviction_order(clock: FakeClock) -> None:
+    ttl_cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    clock.now += 30
+    ttl_cache.set("b", 2)
+    ttl_cache.set("a", 10)
+
+    # "a" was set again, so it outlives its original expiry...
+    clock.now += 40
+    assert ttl_cache.get("a") == 10
+    assert ttl_cache.get("b") == 2
+
+    # ...and "b" is now the oldest entry, evicted first when the cache is full
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 10
+    assert ttl_cache.get("c") == 3
@@ -0,0 +1,47 @@
+"""Tests for the settings snapshot."""
+
+import os
+import subprocess
+import sys
+from dataclasses import fields
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from slack_canvas_creator_from_threads.config import RuntimeSettings, Settings
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_runtime_settings_mirror_settings_fields() -> None:
+    # get_settings() copies every Settings field into RuntimeSettings by keyword
+    assert {f.name: f.type for f in fields(RuntimeSettings)} == {
+        name: field.annotation for name, field in Settings.model_fields.items()
+    }
+
+
+@pytest.mark.parametrize("connections", [0, 11])
+def test_socket_mode_connections_out_of_range_are_rejected(connections: int) -> None:
+    with pytest.raises(ValidationError):
+        Settings(
+            _env_file=None,
+            slack_bot_token="xoxb-test",
+            slack_signing_secret="secret",
+            slack_app_token="xapp-test",
+            slack_socket_mode_connections=connections,
+            openai_api_key="sk-test"
+        )
+
+
+def test_importing_config_does_not_load_settings(tmp_path: Path) -> None:
+    # A fresh interpreter without Slack/OpenAI variables or a .env file
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("SLACK_", "OPENAI_"))}
+    env["PYTHONPATH"] = str(ROOT)
+    subprocess.run(
+        [sys.executable, "-c", "import slack_canvas_creator_from_threads.config"],
+        cwd=tmp_path,
+        env=env,
+        check=True
+    )
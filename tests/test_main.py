@@ -0,0 +1,120 @@
+"""Tests for the Bolt listeners and helpers in main.py."""
+
+import asyncio
+import importlib
+import json
+from types import ModuleType
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from slack_canvas_creator_from_threads.config import get_settings
+
+
+@pytest.fixture(scope="module")
+def main() -> Iterator[ModuleType]:
+    # main builds the Bolt app at import time, which needs the settings
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-test")
+        monkeypatch.setenv("SLACK_SIGNING_SECRET", "secret")
+        monkeypatch.setenv("SLACK_APP_TOKEN", "xapp-test")
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        get_settings.cache_clear()
+        yield importlib.import_module("slack_canvas_creator_from_threads.main")
+    get_settings.cache_clear()
+
+
+@pytest.mark.parametrize("text", [
+    "<@UBOT> まとめて",
+    "<@UBOT> このスレッドを要約して",
+    "<@UBOT> Canvas作成",
+    "<@UBOT> summary please",
+    "<@UBOT> Summary",
+    "<@UBOT> can you MAKE one?",
+    "<@UBOT> create"
+])
+def test_immediate_trigger_matches(main: ModuleType, text: str) -> None:
+    assert main._IMMEDIATE_TRIGGER_RE.search(text)
+
+
+@pytest.mark.parametrize("text", [
+    "<@UBOT>",
+    "<@UBOT> これは何？",
+    "<@UBOT> I created a summaryfile",
+    "<@UBOT> see the makefile",
+    "<@UBOT> recreate"
+])
+def test_immediate_trigger_ignores_other_text(main: ModuleType, text: str) -> None:
+    assert not main._IMMEDIATE_TRIGGER_RE.search(text)
+
+
+class FakeSlackClient:
+    """Records ephemeral messages instead of posting them."""
+
+    def __init__(self) -> None:
+        self.ephemerals: List[Dict[str, Any]] = []
+
+    async def chat_postEphemeral(self, **kwargs: Any) -> None:
+        self.ephemerals.append(kwargs)
+
+
+async def _ack() -> None:
+    pass
+
+
+async def _say(**kwargs: Any) -> None:
+    raise AssertionError("say() is only used outside threads")
+
+
+def _button_body(value: str) -> Dict[str, Any]:
+    return {
+        "actions": [{"value": value}],
+        "channel": {"id": "C1"},
+        "user": {"id": "U1"},
+        "container": {"thread_ts": "1.0"}
+    }
+
+
+def _ask_for_confirmation(main: ModuleType, client: FakeSlackClient) -> str:
+    event = {"text": "<@UBOT> これは何？", "user": "U1", "channel": "C1", "ts": "1.5", "thread_ts": "1.0"}
+    asyncio.run(main.handle_app_mention(event=event, say=_say, client=client))
+
+    blocks = json.loads(client.ephemerals[-1]["blocks"])
+    values = {element["value"] for element in blocks[1]["elements"]}
+    assert len(values) == 1
+    return values.pop()
+
+
+def test_confirmation_buttons_carry_a_short_token(main: ModuleType) -> None:
+    client = FakeSlackClient()
+
+    key = _ask_for_confirmation(main, client)
+
+    assert "|" not in key and len(key) <= 16
+    assert main._pending_confirmations.get(key) == ("C1", "1.0", "U1")
+
+
+def test_confirmation_token_is_used_once(main: ModuleType) -> None:
+    client = FakeSlackClient()
+    key = _ask_for_confirmation(main, client)
+
+    asyncio.run(main.handle_mention_no_button(ack=_ack, body=_button_body(key), client=client))
+    assert client.ephemerals[-1]["text"] == "👍 Canvas作成をキャンセルしました。"
+    assert main._pending_confirmations.get(key) is None
+
+    asyncio.run(main.handle_mention_no_button(ack=_ack, body=_button_body(key), client=client))
+    assert client.ephemerals[-1]["text"].startswith("⌛")
+
+
+def test_unknown_token_does_not_create_a_canvas(main: ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def create_canvas_from_thread(**kwargs: Any) -> str:
+        raise AssertionError("no canvas should be created for an unknown token")
+
+    monkeypatch.setattr(main.canvas_creator, "create_canvas_from_thread", create_canvas_from_thread)
+    client = FakeSlackClient()
+
+    asyncio.run(main.handle_mention_yes_button(ack=_ack, body=_button_body("unknown"), client=client))
+
+    assert len(client.ephemerals) == 1
+    assert client.ephemerals[0]["text"].startswith("⌛")
+    assert client.ephemerals[0]["thread_ts"] == "1.0"
@@ -0,0 +1,340 @@
+"""Tests for OpenAIService, using a fake AsyncOpenAI client."""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from slack_canvas_creator_from_threads import openai_service
+from slack_canvas_creator_from_threads.config import RuntimeSettings, Settings
+from slack_canvas_creator_from_threads.openai_service import CachedSummary, OpenAIService, ThreadContent
+
+
+_TOPIC_RE = re.compile(r"topic-(\d+)")
+
+
+class FakeOpenAI:
+    """
+    Stand-in for AsyncOpenAI covering the files, batches and chat completion calls.
+
+    Every summary is titled after the "topic-N" marker found in its prompt.
+    Batch output lines are written in reverse order, and requests for topics in
+    failing_topics come back with an error status.
+    """
+
+    def __init__(self, failing_topics: Optional[Set[int]] = None) -> None:
+        self.failing_topics: Set[int] = failing_topics or set()
+        self.batch_requests: List[Dict[str, Any]] = []
+        self.chat_requests: List[Dict[str, Any]] = []
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+
+    @staticmethod
+    def _summary(request: Dict[str, Any]) -> str:
+        topic = _TOPIC_RE.search(request["messages"][-1]["content"]).group(1)
+        return f"TITLE: Topic {topic}\n## 概要\nbody {topic}"
+
+    async def _create_file(self, file: Any, purpose: str) -> SimpleNamespace:
+        assert purpose == "batch"
+        self.batch_requests = [json.loads(line) for line in file[1].decode("utf-8").splitlines()]
+        return SimpleNamespace(id="file-input")
+
+    async def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str) -> SimpleNamespace:
+        assert input_file_id == "file-input"
+        return SimpleNamespace(id="batch-1", status="in_progress", output_file_id=None)
+
+    async def _retrieve_batch(self, batch_id: str) -> SimpleNamespace:
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id="file-output")
+
+    async def _file_content(self, file_id: str) -> SimpleNamespace:
+        assert file_id == "file-output"
+        lines: List[str] = []
+        for request in reversed(self.batch_requests):
+            topic = int(_TOPIC_RE.search(request["body"]["messages"][-1]["content"]).group(1))
+            if topic in self.failing_topics:
+                record = {
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 500, "body": {}},
+                    "error": {"message": "server error"}
+                }
+            else:
+                record = {
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"content": self._summary(request["body"])}}]}
+                    },
+                    "error": None
+                }
+            lines.append(json.dumps(record))
+        return SimpleNamespace(text="\n".join(lines))
+
+    async def _create_completion(self, **request: Any) -> AsyncIterator[SimpleNamespace]:
+        self.chat_requests.append(request)
+        summary = self._summary(request)
+
+        async def stream() -> AsyncIterator[SimpleNamespace]:
+            for index in range(0, len(summary), 8):
+                delta = SimpleNamespace(content=summary[index:index + 8])
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        return stream()
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def settings(monkeypatch: pytest.MonkeyPatch) -> RuntimeSettings:
+    values = Settings.model_construct(
+        slack_bot_token="xoxb-test",
+        slack_signing_secret="secret",
+        slack_app_token="xapp-test",
+        openai_api_key="sk-test"
+    ).model_dump()
+    values.update(openai_batch_threshold=2, openai_batch_poll_interval=0)
+    runtime_settings = RuntimeSettings(**values)
+    monkeypatch.setattr(openai_service, "get_settings", lambda: runtime_settings)
+    return runtime_settings
+
+
+def _long_thread(topic: int) -> ThreadContent:
+    return ThreadContent(
+        messages=[
+            {"user": "U1", "text": f"topic-{topic} " + "詳細な議論の内容です。" * 20},
+            {"user": "U2", "text": "了解しました。" * 20}
+        ],
+        thread_link=f"https://example.slack.com/archives/C1/p{topic}"
+    )
+
+
+def _service(fake: FakeOpenAI) -> OpenAIService:
+    service = OpenAIService()
+    service.client = fake
+    return service
+
+
+def test_batch_results_follow_input_order(settings: RuntimeSettings) -> None:
+    fake = FakeOpenAI()
+    threads = [_long_thread(topic) for topic in range(3)]
+
+    results = asyncio.run(_service(fake).summarize_threads_batch(threads))
+
+    assert [title for title, _ in results] == ["Topic 0", "Topic 1", "Topic 2"]
+    assert [content for _, content in results] == ["## 概要\nbody 0", "## 概要\nbody 1", "## 概要\nbody 2"]
+    assert len(fake.batch_requests) == 3
+    assert fake.chat_requests == []
+
+
+def test_failed_batch_lines_are_retried(settings: RuntimeSettings) -> None:
+    fake = FakeOpenAI(failing_topics={1})
+    threads = [_long_thread(topic) for topic in range(3)]
+
+    results = asyncio.run(_service(fake).summarize_threads_batch(threads))
+
+    assert [title for title, _ in results] == ["Topic 0", "Topic 1", "Topic 2"]
+    assert len(fake.chat_requests) == 1
+    assert "topic-1" in fake.chat_requests[0]["messages"][-1]["content"]
+
+
+def test_short_threads_are_summarized_locally(settings: RuntimeSettings) -> None:
+    fake = FakeOpenAI()
+    short_thread = ThreadContent(
+        messages=[{"user": "U3", "text": "@U9 明日の会議は10時からです"}],
+        thread_link="https://example.slack.com/archives/C1/p9"
+    )
+    threads = [_long_thread(0), short_thread, _long_thread(2)]
+
+    results = asyncio.run(_service(fake).summarize_threads_batch(threads))
+
+    assert results[0][0] == "Topic 0"
+    assert results[1] == (
+        "@U9 明日の会議は10時からです",
+        "- [U3]: @U9 明日の会議は10時からです\n\n---\n"
+        "**元のスレッド**: [こちらをクリック](https://example.slack.com/archives/C1/p9)"
+    )
+    assert results[2][0] == "Topic 2"
+    assert [request["custom_id"] for request in fake.batch_requests] == ["0", "2"]
+    assert fake.chat_requests == []
+
+
+def test_below_threshold_uses_regular_endpoint(settings: RuntimeSettings) -> None:
+    fake = FakeOpenAI()
+    short_thread = ThreadContent(messages=[{"user": "U3", "text": "了解です"}])
+    threads = [_long_thread(0), short_thread]
+
+    results = asyncio.run(_service(fake).summarize_threads_batch(threads))
+
+    assert results[0][0] == "Topic 0"
+    assert results[1][0] == "了解です"
+    assert fake.batch_requests == []
+    assert len(fake.chat_requests) == 1
+
+
+def test_summary_request_model_depends_on_prompt_size(settings: RuntimeSettings) -> None:
+    service = _service(FakeOpenAI())
+
+    short_request = service._build_summary_request("短いスレッド")
+    long_request = service._build_summary_request("長いスレッド" * settings.openai_small_model_max_input_tokens)
+
+    assert short_request["model"] == settings.openai_small_model
+    assert long_request["model"] == settings.openai_model
+    assert settings.openai_small_model != settings.openai_model
+    # Both get the full budget so the trailing thread link is never cut off
+    assert short_request["max_tokens"] == long_request["max_tokens"] == 2000
+
+
+def _summarize(service: OpenAIService, messages: List[Dict[str, Any]]) -> Tuple[str, str]:
+    return asyncio.run(service.summarize_thread_content(messages, "https://example.slack.com/p1", cache_key="C1:1.0"))
+
+
+def test_unchanged_thread_is_served_from_the_summary_cache(settings: RuntimeSettings) -> None:
+    fake = FakeOpenAI()
+    service = _service(fake)
+    messages = _long_thread(0).messages
+
+    first = _summarize(service, messages)
+    second = _summarize(service, messages)
+
+    assert first == second == ("Topic 0", "## 概要\nbody 0")
+    assert len(fake.chat_requests) == 1
+
+
+def test_new_messages_update_the_cached_summary(settings: RuntimeSettings) -> None:
+    fake = FakeOpenAI()
+    service = _service(fake)
+    messages = _long_thread(0).messages
+    _summarize(service, messages)
+
+    title, _ = _summarize(service, messages + [{"user": "U3", "text": "topic-1 の件も追加で議論しました"}])
+
+    assert title == "Topic 1"
+    update_prompt = fake.chat_requests[-1]["messages"][-1]["content"]
+    assert "既存のまとめ" in update_prompt
+    assert "[U3]: topic-1 の件も追加で議論しました" in update_prompt
+    assert "詳細な議論の内容です。" not in update_prompt
+    cached = service.summary_cache.get("C1:1.0")
+    assert isinstance(cached, CachedSummary) and cached.message_count == 3
+
+
+def test_messages_to_the_bot_do_not_update_the_cached_summary(settings: RuntimeSettings) -> None:
+    fake = FakeOpenAI()
+    service = _service(fake)
+    messages = _long_thread(0).messages
+    _summarize(service, messages)
+
+    trigger = {"user": "U2", "text": "まとめて", "mentions_bot": True}
+    result = _summarize(service, messages + [trigger])
+
+    assert result == ("Topic 0", "## 概要\nbody 0")
+    assert len(fake.chat_requests) == 1
+
+
+def test_edited_messages_invalidate_the_cached_summary(settings: RuntimeSettings) -> None:
+    fake = FakeOpenAI()
+    service = _service(fake)
+    messages = _long_thread(0).messages
+    _summarize(service, messages)
+
+    edited = [{**messages[0], "text": messages[0]["text"].replace("topic-0", "topic-2")}, *messages[1:]]
+    title, _ = _summarize(service, edited)
+
+    assert title == "Topic 2"
+    full_prompt = fake.chat_requests[-1]["messages"][-1]["content"]
+    assert "既存のまとめ" not in full_prompt
+    assert "詳細な議論の内容です。" in full_prompt
+
+
+class FakeTime:
+    """Replaces time.monotonic and asyncio.sleep; sleeping advances the clock."""
+
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch: pytest.MonkeyPatch) -> FakeTime:
+    fake = FakeTime()
+    monkeypatch.setattr(openai_service, "time", SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(openai_service, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=fake.sleep))
+    return fake
+
+
+def test_rate_limiter_passes_requests_within_the_limits(fake_time: FakeTime) -> None:
+    limiter = openai_service._RateLimiter(max_requests_per_minute=60, max_tokens_per_minute=1000)
+
+    async def acquire_all() -> None:
+        await limiter.acquire(400)
+        await limiter.acquire(400)
+
+    asyncio.run(acquire_all())
+
+    assert fake_time.sleeps == []
+
+
+def test_rate_limiter_waits_for_tokens_to_refill(fake_time: FakeTime) -> None:
+    limiter = openai_service._RateLimiter(max_requests_per_minute=60, max_tokens_per_minute=1000)
+
+    async def acquire_all() -> None:
+        await limiter.acquire(800)
+        await limiter.acquire(500)
+
+    asyncio.run(acquire_all())
+
+    # 300 of the 500 tokens are missing, refilling at 1000 per minute
+    assert fake_time.sleeps == [pytest.approx(18.0)]
+
+
+def test_rate_limiter_waits_for_requests_to_refill(fake_time: FakeTime) -> None:
+    limiter = openai_service._RateLimiter(max_requests_per_minute=2, max_tokens_per_minute=1000)
+
+    async def acquire_all() -> None:
+        for _ in range(3):
+            await limiter.acquire(1)
+
+    asyncio.run(acquire_all())
+
+    assert fake_time.sleeps == [pytest.approx(30.0)]
+
+
+def test_rate_limiter_lets_oversized_requests_through(fake_time: FakeTime) -> None:
+    limiter = openai_service._RateLimiter(max_requests_per_minute=60, max_tokens_per_minute=1000)
+
+    asyncio.run(limiter.acquire(5000))
+
+    assert fake_time.sleeps == []
+
+
+@pytest.mark.parametrize(("response", "expected"), [
+    ("TITLE: 議事録\n## 概要\n内容", ("議事録", "## 概要\n内容")),
+    ("TITLE:   前後の空白  \n\n本文\n", ("前後の空白", "本文")),
+    ("以下がまとめです。\nTITLE: 議事録\n## 概要\n内容", ("議事録", "以下がまとめです。\n## 概要\n内容")),
+    ("## 概要\n内容", ("スレッドまとめ", "## 概要\n内容")),
+    ("TITLE: タイトルのみ", ("タイトルのみ", ""))
+])
+def test_extract_title_and_content(settings: RuntimeSettings, response: str, expected: Tuple[str, str]) -> None:
+    assert _service(FakeOpenAI())._extract_title_and_content(response) == expected
+
+
+@pytest.mark.parametrize(("response", "expected"), [
+    ("```markdown\nTITLE: 議事録\n本文\n```", "TITLE: 議事録\n本文"),
+    ("  ```\nTITLE: 議事録\n```  \n", "TITLE: 議事録"),
+    ("TITLE: 議事録\n本文\n", "TITLE: 議事録\n本文"),
+    ("TITLE: 例\n```python\nprint(1)\n```\n続き", "TITLE: 例\n```python\nprint(1)\n```\n続き")
+])
+def test_clean_markdown_response_strips_only_a_wrapping_fence(
+    settings: RuntimeSettings, response: str, expected: str
+) -> None:
+    assert _service(FakeOpenAI())._clean_markdown_response(response) == expected
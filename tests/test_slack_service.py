@@ -0,0 +1,75 @@
+"""Tests for SlackService, using a fake Slack Web API client."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from slack_canvas_creator_from_threads import slack_service
+from slack_canvas_creator_from_threads.slack_service import SlackService
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> SlackService:
+    monkeypatch.setattr(slack_service, "get_settings", lambda: SimpleNamespace(slack_bot_token="xoxb-test"))
+    return SlackService()
+
+
+@pytest.mark.parametrize(("text", "expected"), [
+    ("<@U123> 確認お願いします", "@U123 確認お願いします"),
+    ("<@U123|tanaka> さん", "@tanaka さん"),
+    ("<#C123|general> に投稿", "#general に投稿"),
+    ("<!here> 集合", "@here 集合"),
+    ("<!subteam^S123|@devs> 見てください", "@devs 見てください"),
+    ("資料は <https://example.com/doc|こちら>", "資料は こちら"),
+    ("<https://example.com>", "https://example.com"),
+    ("a &lt; b &amp;&amp; c &gt; d", "a < b && c > d"),
+])
+def test_normalize_text_turns_markup_into_plain_text(service: SlackService, text: str, expected: str) -> None:
+    assert service._normalize_text(text) == expected
+
+
+def test_normalize_text_drops_the_bot_mention(service: SlackService) -> None:
+    service._bot_user_id = "UBOT"
+
+    assert service._normalize_text("<@UBOT> まとめて") == "まとめて"
+    assert service._normalize_text("<@UBOT>") == ""
+    assert service._normalize_text("<@U123> <@UBOT> 了解") == "@U123 了解"
+
+
+class FakeRepliesClient:
+    """Serves conversations.replies pages the way Slack does, repeating the parent on each page."""
+
+    def __init__(self, pages: List[List[Dict[str, Any]]]) -> None:
+        self.pages: List[List[Dict[str, Any]]] = pages
+        self.cursors: List[Optional[str]] = []
+
+    async def conversations_replies(
+        self, channel: str, ts: str, inclusive: bool, limit: int, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        self.cursors.append(cursor)
+        index = 0 if cursor is None else int(cursor)
+        next_cursor = str(index + 1) if index + 1 < len(self.pages) else ""
+        return {"messages": self.pages[index], "response_metadata": {"next_cursor": next_cursor}}
+
+
+def test_get_thread_messages_follows_cursor_and_skips_repeated_parent(service: SlackService) -> None:
+    service._bot_user_id = "UBOT"
+    parent = {"ts": "1.0", "user": "U1", "text": "親メッセージ"}
+    service.client = FakeRepliesClient([
+        [parent, {"ts": "1.1", "user": "U2", "text": "返信1"}, {"ts": "1.2", "bot_id": "B1", "text": "bot"}],
+        [parent, {"ts": "1.3", "user": "U3", "text": "<@U1> 返信2"}, {"ts": "1.4", "user": "U2", "text": ""}],
+        [parent, {"ts": "1.5", "user": "U1", "text": "返信3"}, {"ts": "1.6", "user": "U2", "text": "<@UBOT> まとめて"}]
+    ])
+
+    messages = asyncio.run(service.get_thread_messages("C1", "1.0"))
+
+    assert service.client.cursors == [None, "1", "2"]
+    assert messages == [
+        {"user": "U1", "text": "親メッセージ", "ts": "1.0", "mentions_bot": False},
+        {"user": "U2", "text": "返信1", "ts": "1.1", "mentions_bot": False},
+        {"user": "U3", "text": "@U1 返信2", "ts": "1.3", "mentions_bot": False},
+        {"user": "U1", "text": "返信3", "ts": "1.5", "mentions_bot": False},
+        {"user": "U2", "text": "まとめて", "ts": "1.6", "mentions_bot": True}
+    ]